@@ -0,0 +1,25 @@
+# build_ext.py
+#
+# Ahead-of-time compiles the numba audio kernels into
+# src/utils/_pickperfect_kernels.*.so, so worker processes skip JIT on their
+# first task. Run once per build/deploy image:
+#
+#     python build_ext.py
+#
+# src.utils.audio_kernels falls back to @njit when the module is missing.
+
+from pathlib import Path
+from numba.pycc import CC
+from src.utils.audio_kernels import _mean_std, _rhythm_score_parts, _score_chroma
+
+cc = CC("_pickperfect_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent / "src" / "utils")
+
+cc.export("mean_std_f32", "UniTuple(f8, 2)(f4[:])")(_mean_std)
+cc.export("mean_std_f64", "UniTuple(f8, 2)(f8[:])")(_mean_std)
+cc.export("rhythm_score_parts", "UniTuple(f8, 3)(f8, f8, f8, f8, f8)")(_rhythm_score_parts)
+cc.export("score_chroma", "f4[:](f4[:], f4[:, :])")(_score_chroma)
+
+if __name__ == "__main__":
+    cc.compile()
+    print("Built", cc.output_file, "in", cc.output_dir)
@@ -1,48 +1,38 @@
 from fastapi import FastAPI
-import boto3
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 import os
-from dotenv import load_dotenv
-from uuid import uuid4
-from datetime import datetime
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from src.core.database import connect_to_mongo, close_mongo_connection
-from src.api.routes_videos import router as videos_router
-from uuid import uuid4
-from datetime import datetime
-from src.core.database import connect_to_mongo, close_mongo_connection
-from src.api.routes_videos import router as videos_router
+from src.api.routes_videos import router as videos_router, get_video_url
 from src.api.routes_auth import router as auth_router
+from src.core.config import settings
+from src.core.logging_config import setup_logging, stop_logging
+from src.core.s3 import async_s3, connect_async_s3, close_async_s3
 
-app = FastAPI()
-
-@app.on_event("startup")
-async def startup_event():
-    await connect_to_mongo()
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    await close_mongo_connection()
-
-app.include_router(videos_router, prefix="/videos", tags=["videos"])
-app.include_router(auth_router, prefix="/auth", tags=["auth"])
-# load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env.development"))
-load_dotenv()
+setup_logging()
 
+# orjson encodes responses several times faster than json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    await connect_async_s3()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_mongo_connection()
+    await close_async_s3()
+    stop_logging()
 
 app.include_router(videos_router, prefix="/videos", tags=["videos"])
-# load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env.development"))
-load_dotenv()
+app.include_router(auth_router, prefix="/auth", tags=["auth"])
+# .env / .env.development are loaded once by src.core.config
 
-bucket_name = os.getenv("AWS_S3_BUCKET")
+bucket_name = settings.AWS_S3_BUCKET
 # Allow CORS (for frontend)
 app.add_middleware(
     CORSMiddleware,
@@ -52,13 +42,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION")
-)
+VIDEO_EXTENSIONS = frozenset({"mp4", "mov", "avi", "webm", "mkv"})
+
+# Presigning is local CPU work and the low-level client is thread-safe
+presign_executor = ThreadPoolExecutor(max_workers=16)
 
 
 
@@ -71,35 +58,39 @@ async def root():
 
 
 @app.get("/all-videos")
-def get_all_videos():
-    # List everything in bucket root (no folders)
-    response = s3_client.list_objects_v2(Bucket=bucket_name)
-
-    if "Contents" not in response:
-        return {"videos": []}
-
-    video_urls = []
-
-    for obj in response["Contents"]:
-        key = obj["Key"]
-
-        # skip non-video files (optional)
-        if not key.lower().endswith((".mp4", ".mov", ".avi", ".webm", ".mkv")):
-            continue
-
-        # generate pre-signed URL
-        url = s3_client.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={"Bucket": bucket_name, "Key": key},
-            ExpiresIn=3600
-        )
-
-        video_urls.append({
-            "key": key,
-            "url": url
-        })
-
-    return {"videos": video_urls}
+async def get_all_videos():
+    # List everything in the bucket, page by page (a single call stops at 1000 keys)
+    paginator = async_s3.client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=bucket_name,
+        PaginationConfig={"PageSize": 1000}
+    )
+
+    async def stream_videos():
+        loop = asyncio.get_running_loop()
+
+        async for page in pages:
+            keys = []
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+
+                # skip non-video files (optional)
+                if key.rpartition(".")[2].lower() not in VIDEO_EXTENSIONS:
+                    continue
+
+                keys.append(key)
+
+            # pre-signed URLs (reused while still fresh), signed in parallel
+            urls = await asyncio.gather(*[
+                loop.run_in_executor(presign_executor, get_video_url, key)
+                for key in keys
+            ])
+
+            # One JSON object per line, sent as soon as its page is signed
+            for key, url in zip(keys, urls):
+                yield orjson.dumps({"key": key, "url": url}) + b"\n"
+
+    return StreamingResponse(stream_videos(), media_type="application/x-ndjson")
 
 @app.post("/webhook")
 async def webhook(data: dict):
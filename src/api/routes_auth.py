@@ -1,9 +1,11 @@
 # routes/auth.py
 from fastapi import APIRouter, HTTPException, status
+from pymongo.errors import DuplicateKeyError
 from src.database.schemas.auth import SignupRequest, LoginRequest
 from src.database.collections import get_users_collection
 from src.core.security import hash_password,verify_password
 from datetime import datetime
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,38 +13,37 @@ router = APIRouter()
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(payload: SignupRequest):
-    # 1. Check if user exists
     users_collection = get_users_collection()
-    existing_user = await users_collection.find_one(
-        {"email": payload.email}
-    )
-    print("Checking if user exists",payload.email)
-    logger.info("Checking if user exists",payload.email)
-    if existing_user:
+
+    # 1. Hash password
+    # bcrypt is slow and CPU-bound, keep it off the event loop
+    hashed_password = await asyncio.to_thread(hash_password, payload.password)
+
+    # 2. Insert user (unique index on email rejects existing users)
+    try:
+        await users_collection.insert_one({
+            "email": payload.email,
+            "password": hashed_password,
+            "created_at": datetime.utcnow(),
+        })
+    except DuplicateKeyError:
+        logger.debug("User already exists: %s", payload.email)
         raise HTTPException(
             status_code=400,
             detail="User already exists",
         )
 
-    # 2. Hash password
-    print("Hashing password for new user",payload.password)
-    logger.info("Hashing password for new user",payload.password)
-    hashed_password = hash_password(payload.password)
-
-    # 3. Insert user
-    await users_collection.insert_one({
-        "email": payload.email,
-        "password": hashed_password,
-        "created_at": datetime.utcnow(),
-    })
-
     return {"success": True}
 
 @router.post("/login")
 async def login(payload: LoginRequest):
     users_collection = get_users_collection()
 
-    user = await users_collection.find_one({"email": payload.email})
+    # Only what login needs, not the whole user document
+    user = await users_collection.find_one(
+        {"email": payload.email},
+        projection={"_id": 0, "email": 1, "password": 1}
+    )
 
     # ❌ User not found
     if not user:
@@ -52,7 +53,10 @@ async def login(payload: LoginRequest):
         )
 
     # ❌ Password mismatch
-    if not verify_password(payload.password, user["password"]):
+    password_ok = await asyncio.to_thread(
+        verify_password, payload.password, user["password"]
+    )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
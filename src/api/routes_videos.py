@@ -1,24 +1,33 @@
 from fastapi import APIRouter
 from src.core.database import mongodb
+from src.core.config import settings
 from uuid import uuid4
-import os
-from datetime import datetime
-import boto3
+import logging
+from datetime import datetime, timezone
+import threading
+from cachetools import TTLCache, cached
 from botocore.exceptions import NoCredentialsError
 from pydantic import BaseModel
-from src.app_celery.tasks import process_music_video
-
+from typing import List, Union
+from pymongo import UpdateOne
+from pymongo.write_concern import WriteConcern
+from src.app_celery.tasks import process_music_videos
+from src.core.s3 import presign_get, presign_put, PRESIGN_EXPIRES_IN
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
-bucket_name = os.getenv("AWS_S3_BUCKET")
+bucket_name = settings.AWS_S3_BUCKET
+
+# Presigned GET URLs stay valid for PRESIGN_EXPIRES_IN, so reuse them for half
+# of that window; callers always get at least 30 minutes of validity.
+video_url_cache = TTLCache(maxsize=10_000, ttl=PRESIGN_EXPIRES_IN // 2)
+video_url_cache_lock = threading.Lock()
+
+
+@cached(video_url_cache, key=lambda s3_key: s3_key, lock=video_url_cache_lock)
+def get_video_url(s3_key: str) -> str:
+    return presign_get(bucket_name, s3_key)
 
-# Initialize S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION")
-)
 
 class S3UploadEvent(BaseModel):
     status: str
@@ -28,38 +37,31 @@ class S3UploadEvent(BaseModel):
 @router.get("/generate-presigned-url")
 async def get_presigned_url(filename: str):
     try:
-        
-        print("Loaded region name:", os.getenv("AWS_REGION"))
-        print("Loaded bucket name:", bucket_name)
-        
         video_id = f"vid_{uuid4().hex}"
         s3_key = f"videos/{video_id}.mp4"
 
+        now = datetime.now(timezone.utc)
         metadata_doc = {
                 "_id": video_id,
                 "original_filename": filename,
                 "s3_key": s3_key,
                 "status": "PENDING_UPLOAD",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
         
-        result = await mongodb.db["videos"].insert_one(metadata_doc)
-        print("Inserted ID:", result.inserted_id)
+        # Placeholder doc the webhook overwrites: acknowledged by the primary,
+        # but no need to wait for the journal flush before handing out the URL
+        result = await mongodb.db["videos"].with_options(
+            write_concern=WriteConcern(w=1, j=False)
+        ).insert_one(metadata_doc)
+        logger.debug("Inserted video metadata: %s", result.inserted_id)
 
         if not bucket_name:
                 raise ValueError("AWS_S3_BUCKET is not set in environment variables.")
 
         
-        presigned_url = s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': bucket_name,
-                    'Key': s3_key,  
-                    'ContentType': 'video/mp4'
-                },
-                ExpiresIn=3600
-    )
+        presigned_url = presign_put(bucket_name, s3_key, 'video/mp4')
         return {
             'Key': s3_key, 
             "url": presigned_url
@@ -68,17 +70,30 @@ async def get_presigned_url(filename: str):
         raise HTTPException(status_code=500, detail="AWS credentials not found")
     
 @router.post("/webhook")
-async def video_upload_webhook(event: S3UploadEvent):
-    print("Webhook received:", event)
+async def video_upload_webhook(events: Union[List[S3UploadEvent], S3UploadEvent]):
+    # S3 notifications can carry several records; a single event is still accepted
+    if isinstance(events, S3UploadEvent):
+        events = [events]
+    logger.debug("Webhook received %d event(s)", len(events))
+    if not events:
+        return {"message": "No events to process"}
+
+    # Objects changed or were removed, don't hand out stale URLs for them
+    with video_url_cache_lock:
+        for event in events:
+            video_url_cache.pop(event.key, None)
+
+    # One round-trip for the whole batch
+    await mongodb.db["videos"].bulk_write(
+        [UpdateOne({"s3_key": event.key}, {"$set": {"status": event.status}}) for event in events],
+        ordered=False
+    )
 
-    await mongodb.db["videos"].update_one({"s3_key": event.key}, {"$set": {"status": event.status}})
-    print(f"Updated video with key {event.key} to status {event.status}")
-     #  Trigger Celery task (non-blocking)
-    task = process_music_video.delay( event.key)
-    print("Triggered Celery task:", task)
-    # print(f"Celery task ID: {task.video_id}")
+    #  Trigger Celery tasks (non-blocking): one analysis task per video,
+    #  results saved together by the chord callback
+    result = process_music_videos([event.key for event in events])
+    logger.debug("Triggered Celery chord %s for %d video(s)", result.id, len(events))
 
     return {
         "message": "Webhook processed, background processing started",
-        # "task_id": task.video_id
-    }
\ No newline at end of file
+    }
@@ -1,57 +1,99 @@
 from src.app_celery.celery_app import celery_app
-import time
+from celery import chord
 import logging
 from src.core.database_sync import mongodb_sync
 
 logger = logging.getLogger(__name__)
 
-from src.utils.task_helpers import (
-    download_video_from_s3,
-    extract_audio_from_video,
-    analyze_audio_features,
-    detect_chords,
-    detect_rhythm,
-    evaluate_performance,
-    save_analysis_result,
-    update_video_status
-)
-
 @celery_app.task(name="process_music_video")
 def process_music_video(s3_key: str):
+    """
+    Single-video path: runs the same pipeline as a batch (analyze_video) and
+    saves the result straight away, without the chord/result backend.
+    """
+    # Imported here, not at module level: task_helpers pulls in librosa/numpy,
+    # which the API (it only enqueues) and debug_tasks.py never need.
+    from src.utils.task_helpers import analyze_video, save_analysis_result
+
     # 🔥 GUARANTEED DB INIT
     mongodb_sync.connect()
-    video_path = download_video_from_s3(s3_key)
-    logger.info("Downloaded video to:", video_path)
-    
-    audio_path = extract_audio_from_video(video_path)
-    logger.info("Extracted audio to:", audio_path)
-    
-    features = analyze_audio_features(audio_path)
-    logger.info("Analyzed audio features.", features)
-    logger.info("Feature keys: %s", list(features.keys()))
-    logger.info("Feature summary: %s", {k: type(v) for k, v in features.items()})
-
-    chord_result = detect_chords(features)
-    logger.info(f"Detected chords. Result: {chord_result}")
-    
-    rhythm_result = detect_rhythm(features)
-    logger.info(f"Detected rhythm. Result: {rhythm_result}")
-    
-    performance_score = evaluate_performance(
-        chord_result,
-        rhythm_result
-    )
-    logger.info(f"Evaluated performance. Score: {performance_score}")
-    
+    result = analyze_video(s3_key)
+    logger.info(f"Evaluated performance. Score: {result['performance_score']}")
+
+    # Results and final status in one write
     save_analysis_result(
         s3_key,
-        chord_result,
-        rhythm_result,
-        performance_score
+        result["chords"],
+        result["rhythm"],
+        result["performance_score"],
+        status="processed"
     )
 
-    update_video_status(s3_key, "processed")
-    logger.info(f"Updated video status to 'processed' for {s3_key}")
-    
     return {"s3_key": s3_key, "status": "completed"}
 
+
+@celery_app.task(name="analyze_music_video")
+def analyze_music_video(s3_key: str):
+    """
+    Analysis half of a batch: runs the pipeline without writing to MongoDB.
+    Failures are returned, not raised, so one bad video doesn't cancel the
+    chord callback for the rest of the batch.
+    """
+    from src.utils.task_helpers import analyze_video
+
+    try:
+        return analyze_video(s3_key)
+    except Exception as e:
+        logger.exception(f"Analysis failed for {s3_key}")
+        return {"s3_key": s3_key, "error": str(e)}
+
+
+@celery_app.task(name="save_music_video_results")
+def save_music_video_results(results: list):
+    """
+    Chord callback: saves every successful analysis of a batch in a single
+    bulk write.
+    """
+    from src.utils.task_helpers import build_analysis_update, save_analysis_results
+
+    mongodb_sync.connect()
+    completed = [result for result in results if "error" not in result]
+    failed = [result["s3_key"] for result in results if "error" in result]
+
+    save_analysis_results([
+        (
+            result["s3_key"],
+            build_analysis_update(
+                result["chords"],
+                result["rhythm"],
+                result["performance_score"],
+                status="processed"
+            )
+        )
+        for result in completed
+    ])
+    logger.info(f"Processed {len(completed)}/{len(results)} videos")
+
+    return {
+        "completed": [result["s3_key"] for result in completed],
+        "failed": failed
+    }
+
+
+def process_music_videos(s3_keys: list):
+    """
+    Analyzes a batch of videos in parallel across the Celery worker processes
+    (one video per task), then saves all results with one bulk write.
+
+    Results land only once the slowest video finishes, the chord needs the
+    Redis result backend, and if a header task is killed at its hard time
+    limit the callback never runs and the whole batch stays unsaved.
+
+    Returns the chord's AsyncResult, or None for an empty batch.
+    """
+    if not s3_keys:
+        return None
+
+    return chord(
+        analyze_music_video.s(s3_key) for s3_key in s3_keys
+    )(save_music_video_results.s())
@@ -7,10 +7,17 @@ env_path = BASE_DIR / ".env.development"
 # print("Loading environment variables from:", env_path)
 
 load_dotenv(env_path)
+# Plain .env as a fallback, before Settings reads anything
+load_dotenv(BASE_DIR / ".env")
 
 class Settings:
     MONGO_URI: str = os.getenv("MONGO_URI")
     MONGO_DB: str = os.getenv("MONGO_DB", "pickperfect_db")
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
 
-settings = Settings()
+    AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID")
+    AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY")
+    AWS_REGION: str = os.getenv("AWS_REGION")
+    AWS_S3_BUCKET: str = os.getenv("AWS_S3_BUCKET")
 
+settings = Settings()
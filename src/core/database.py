@@ -10,9 +10,15 @@ mongodb = MongoDB()
 async def connect_to_mongo():
     mongodb.client = AsyncIOMotorClient(settings.MONGO_URI)
     mongodb.db = mongodb.client[settings.MONGO_DB]
-    print("ENV MONGO_DB:", settings.MONGO_DB)
-    print("Client DB name:", mongodb.db.name)
-    print("All collections in this DB:", await mongodb.db.list_collection_names())
+    # Indexes for the hot lookups (no-ops when they already exist)
+    await mongodb.db["videos"].create_index("s3_key", unique=True)
+    # signup relies on this to reject duplicate emails atomically
+    await mongodb.db["users"].create_index("email", unique=True)
+    if settings.DEBUG:
+        # Extra round-trip, only worth paying when diagnosing config issues
+        print("ENV MONGO_DB:", settings.MONGO_DB)
+        print("Client DB name:", mongodb.db.name)
+        print("All collections in this DB:", await mongodb.db.list_collection_names())
     # print("mongo db uri:", settings.MONGO_URI)
     print("✔️ Connected to MongoDB:", settings.MONGO_DB)
 
@@ -0,0 +1,33 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+log_queue = queue.SimpleQueue()
+log_listener: QueueListener = None
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Routes all records through a queue so request handlers only enqueue them;
+    the final formatting and the stream write happen on the listener's thread.
+    """
+    global log_listener
+    if log_listener is not None:
+        return  # ✅ already configured
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    log_listener.start()
+
+def stop_logging():
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()  # flushes whatever is still queued
+        log_listener = None
@@ -0,0 +1,106 @@
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from urllib.parse import quote, urlsplit
+import boto3
+from aiobotocore.session import get_session
+from botocore.auth import S3SigV4QueryAuth
+from botocore.awsrequest import AWSRequest
+from botocore.config import Config
+from .config import settings
+
+PRESIGN_EXPIRES_IN = 3600
+
+# SigV4 only (we presign with it anyway), virtual-hosted URLs like presign_*,
+# and a kept-alive pool big enough for the listing/presign thread pool.
+S3_CLIENT_CONFIG = Config(
+    signature_version="s3v4",
+    retries={"max_attempts": 2, "mode": "standard"},
+    s3={"addressing_style": "virtual"},
+    tcp_keepalive=True,
+    max_pool_connections=64
+)
+
+
+@lru_cache(maxsize=1)
+def get_s3_session():
+    return boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION
+    )
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    # One client per process: building it resolves the botocore session,
+    # loaders and endpoint rules, which is too expensive to repeat per import.
+    return get_s3_session().client("s3", config=S3_CLIENT_CONFIG)
+
+
+class AsyncS3:
+    client = None
+    exit_stack: AsyncExitStack = None
+
+async_s3 = AsyncS3()
+
+
+async def connect_async_s3():
+    # aiobotocore clients are async context managers; keep it open for the
+    # app's lifetime so network calls (listing) don't block the event loop.
+    async_s3.exit_stack = AsyncExitStack()
+    async_s3.client = await async_s3.exit_stack.enter_async_context(
+        get_session().create_client(
+            "s3",
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            config=S3_CLIENT_CONFIG
+        )
+    )
+
+
+async def close_async_s3():
+    # Startup may have failed before connect_async_s3 ran
+    if async_s3.exit_stack is not None:
+        await async_s3.exit_stack.aclose()
+        async_s3.exit_stack = None
+    async_s3.client = None
+
+
+@lru_cache(maxsize=None)
+def _bucket_base_url(bucket: str) -> str:
+    # Resolve the endpoint once per bucket instead of on every presign call
+    endpoint = urlsplit(get_s3_client()._endpoint.host)
+    return f"{endpoint.scheme}://{bucket}.{endpoint.netloc}"
+
+
+@lru_cache(maxsize=None)
+def _query_signer(expires_in: int) -> S3SigV4QueryAuth:
+    client = get_s3_client()
+    return S3SigV4QueryAuth(
+        get_s3_session().get_credentials(),
+        "s3",
+        client.meta.region_name or "us-east-1",
+        expires=expires_in
+    )
+
+
+def _presign(method: str, bucket: str, key: str, expires_in: int, headers=None) -> str:
+    url = f"{_bucket_base_url(bucket)}/{quote(key, safe='/~')}"
+    request = AWSRequest(method=method, url=url, headers=headers or {})
+    _query_signer(expires_in).add_auth(request)
+    return request.url
+
+
+def presign_put(bucket: str, key: str, content_type: str, expires_in: int = PRESIGN_EXPIRES_IN) -> str:
+    """
+    Presigned PUT URL; the uploader must send the same Content-Type header.
+    """
+    return _presign("PUT", bucket, key, expires_in, {"Content-Type": content_type})
+
+
+def presign_get(bucket: str, key: str, expires_in: int = PRESIGN_EXPIRES_IN) -> str:
+    """
+    Presigned GET URL for downloading/streaming an object.
+    """
+    return _presign("GET", bucket, key, expires_in)
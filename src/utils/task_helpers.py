@@ -1,4 +1,6 @@
 import boto3
+from botocore.config import Config
+import functools
 import os
 import subprocess
 import tempfile
@@ -6,16 +8,19 @@ from dotenv import load_dotenv
 from pathlib import Path
 import librosa
 import numpy as np
+import soundfile as sf
 from src.core.database import mongodb
 from datetime import datetime
 import logging
 from src.core.database_sync import mongodb_sync
+from pymongo import UpdateOne
+from src.utils.audio_kernels import mean_std, rhythm_score_parts, score_chroma
 
 logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parents[2]
 # Load .env only if it exists
 dotenv_path = BASE_DIR / ".env.development"
-print("Loading .env from:", dotenv_path)
+logger.debug("Loading .env from: %s", dotenv_path)
 if dotenv_path.exists():
     load_dotenv(dotenv_path)
 
@@ -26,31 +31,51 @@ missing = [v for v in required_vars if not os.getenv(v)]
 if missing:
     raise RuntimeError(f"Missing env vars: {missing}")
 
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION")
-)
+@functools.cache
+def get_s3():
+    """
+    S3 client for this process, built on first use rather than at import so a
+    forking parent never hands its (not fork-safe) client and sockets to
+    children. Its own session keeps it independent of boto3's default one.
+    """
+    session = boto3.session.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION")
+    )
+    return session.client(
+        "s3",
+        config=Config(
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 5}
+        )
+    )
 
 
+@functools.cache
+def get_bucket_name() -> str:
+    """
+    AWS_S3_BUCKET, validated once per process instead of on every download.
+    """
+    bucket_name = os.getenv("AWS_S3_BUCKET")
+    if not bucket_name:
+        raise RuntimeError("AWS_S3_BUCKET is not set")
+    return bucket_name
+
 
 def download_video_from_s3(s3_key: str) -> str:
     """
     Downloads video from S3 using s3_key
     Returns local file path
     """
-    BUCKET_NAME = os.getenv("AWS_S3_BUCKET")
-    print("S3 Bucket Name in task_helpers:", BUCKET_NAME)
-    if not BUCKET_NAME:
-        raise RuntimeError("AWS_S3_BUCKET is not set")
+    BUCKET_NAME = get_bucket_name()
     if not s3_key:
         raise RuntimeError("s3_key is missing")
     
     tmp_dir = tempfile.mkdtemp()
     local_path = os.path.join(tmp_dir, os.path.basename(s3_key))
     
-    s3_client.download_file(
+    get_s3().download_file(
         Bucket=BUCKET_NAME,
         Key=s3_key,
         Filename=local_path
@@ -60,6 +85,59 @@ def download_video_from_s3(s3_key: str) -> str:
 
 
 
+# The signed URL sits on ffmpeg's argv (visible in ps) while it decodes, so
+# it only needs to outlive one decode, including reconnects
+FFMPEG_URL_EXPIRES_IN = 300
+
+# Sample rate ffmpeg resamples to (chords/rhythm need nothing above ~8 kHz)
+AUDIO_SAMPLE_RATE = 22050
+
+def build_ffmpeg_audio_command(source: str, output: str) -> list:
+    """
+    FFmpeg command turning a video (file path or URL) into mono 16-bit PCM:
+    a WAV file, or raw samples on stdout when output is "pipe:1".
+    """
+    # -y        → overwrite output if exists
+    # -hide_banner / -loglevel error → stderr only carries real errors, not
+    #             banner and progress lines we would buffer for nothing
+    # -nostdin  → no interactive keys
+    # -reconnect / -reconnect_streamed → URL inputs only: resume after a
+    #             dropped HTTP connection instead of failing the decode
+    # -i        → input file
+    # -map      → only the first audio stream ("?" = don't fail on mapping)
+    # -vn/-sn/-dn → no video, subtitle or data streams in the output
+    # -acodec   → audio codec (PCM = uncompressed, ML-friendly)
+    # -ar       → sample rate (22.05 kHz; every STFT downstream gets half
+    #             the samples of 44.1 kHz)
+    # -ac       → number of channels (mono is better for ML)
+    # -threads  → before -i, so it applies to the decoder: one thread per
+    #             task, parallelism comes from the Celery worker processes
+    # -f s16le  → headerless little-endian samples (stdout only)
+    command = [
+        "ffmpeg",
+        "-y",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-nostdin",
+        "-threads", "1",
+    ]
+    if source.startswith(("http://", "https://")):
+        command += ["-reconnect", "1", "-reconnect_streamed", "1"]
+    command += [
+        "-i", source,
+        "-map", "0:a:0?",
+        "-vn", "-sn", "-dn",
+        "-acodec", "pcm_s16le",
+        "-ar", str(AUDIO_SAMPLE_RATE),
+        "-ac", "1",
+    ]
+    if output == "pipe:1":
+        command += ["-f", "s16le"]
+    command.append(output)
+    return command
+
+
+
 def extract_audio_from_video(video_path: str) -> str:
     """
     Extracts audio from a video file using FFmpeg.
@@ -88,28 +166,10 @@ def extract_audio_from_video(video_path: str) -> str:
     base, _ = os.path.splitext(video_path)
     audio_path = f"{base}.wav"
 
-    # ---------- FFmpeg command ----------
-    # -y        → overwrite output if exists
-    # -i        → input file
-    # -vn       → disable video recording
-    # -acodec   → audio codec (PCM = uncompressed, ML-friendly)
-    # -ar       → sample rate (44.1 kHz is standard)
-    # -ac       → number of channels (mono is better for ML)
-    command = [
-        "ffmpeg",
-        "-y",
-        "-i", video_path,
-        "-vn",
-        "-acodec", "pcm_s16le",
-        "-ar", "44100",
-        "-ac", "1",
-        audio_path
-    ]
-
     # ---------- Run FFmpeg ----------
     try:
         subprocess.run(
-            command,
+            build_ffmpeg_audio_command(video_path, audio_path),
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             check=True
@@ -127,66 +187,175 @@ def extract_audio_from_video(video_path: str) -> str:
 
 
 
-def analyze_audio_features(audio_path: str) -> dict:
+def pcm_to_float32(buffer) -> np.ndarray:
+    """
+    Converts raw s16le bytes to float32 samples in [-1, 1), the same scale
+    soundfile/librosa use.
+    """
+    usable = len(buffer) - len(buffer) % 2
+    samples = np.frombuffer(memoryview(buffer)[:usable], dtype=np.int16).astype(np.float32)
+    samples *= np.float32(1 / 32768.0)
+    return samples
+
+
+def run_ffmpeg_to_pcm(source: str):
     """
-    Analyzes core musical features from an audio file.
+    Runs FFmpeg with raw PCM on stdout and reads it straight into memory.
 
     Args:
-        audio_path (str): Path to extracted WAV audio file
+        source (str): Video path or (presigned) URL
 
     Returns:
-        dict: Dictionary containing extracted audio features
+        tuple: (returncode, samples as np.float32 array, stderr text)
     """
+    process = subprocess.Popen(
+        build_ffmpeg_audio_command(source, "pipe:1"),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    # communicate drains stdout and stderr together, so neither pipe can fill up
+    stdout, stderr = process.communicate()
+
+    return process.returncode, pcm_to_float32(stdout), stderr.decode(errors="replace")
+
+
+def stream_pcm_from_s3(s3_key: str):
+    """
+    Lets FFmpeg read the S3 object over HTTP and decodes it straight into a
+    float32 array, so neither the video nor the audio is written to disk and
+    download overlaps with decoding.
+
+    FFmpeg's HTTP input seeks with range requests, so MP4s with the moov atom
+    at the end (typical for phone/camera recordings) are read once, not
+    streamed to the end, failed, and downloaded again.
+
+    Args:
+        s3_key (str): Key of the uploaded video in S3
+
+    Returns:
+        tuple: (samples, sample_rate)
+
+    Raises:
+        RuntimeError: If ffmpeg can't read or decode the object
+    """
+    BUCKET_NAME = get_bucket_name()
+    if not s3_key:
+        raise RuntimeError("s3_key is missing")
+
+    url = get_s3().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": BUCKET_NAME, "Key": s3_key},
+        ExpiresIn=FFMPEG_URL_EXPIRES_IN
+    )
+
+    returncode, samples, stderr = run_ffmpeg_to_pcm(url)
+    if returncode != 0:
+        # stderr may echo the signed URL, keep it out of the message
+        raise RuntimeError(
+            f"FFmpeg failed to extract audio from {s3_key}: {stderr.replace(url, '<presigned url>')}"
+        )
+
+    return samples, AUDIO_SAMPLE_RATE
+
 
-    # ---------- Validation ----------
-    if not audio_path:
-        raise RuntimeError("Audio path is missing")
 
-    if not os.path.exists(audio_path):
-        raise RuntimeError(f"Audio file not found: {audio_path}")
+
+def analyze_audio_features(audio, sr: int = None) -> dict:
+    """
+    Analyzes core musical features from audio.
+
+    Args:
+        audio (str | np.ndarray): Path to extracted WAV audio file, or mono
+            samples already decoded (e.g. from stream_pcm_from_s3)
+        sr (int): Sample rate, required when audio is an array
+
+    Returns:
+        dict: Dictionary containing extracted audio features
+    """
 
     # ---------- Load audio ----------
     # y  → audio time series
     # sr → sampling rate
-    y, sr = librosa.load(audio_path, sr=None, mono=True)
+    if isinstance(audio, np.ndarray):
+        if not sr:
+            raise RuntimeError("Sample rate is missing")
+        y = audio
+    else:
+        # ---------- Validation ----------
+        if not audio:
+            raise RuntimeError("Audio path is missing")
 
-    # ---------- Tempo & rhythm ----------
-    tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+        if not os.path.exists(audio):
+            raise RuntimeError(f"Audio file not found: {audio}")
+
+        # The WAV is our own ffmpeg output, so read it with soundfile directly
+        # instead of going through librosa.load's decoder dispatch.
+        y, sr = sf.read(audio, dtype="float32", always_2d=False)
+        if y.ndim == 2:
+            y = y.mean(axis=1, dtype=np.float32)
+
+    # Pin float32 (librosa can promote to float64 mid-pipeline): half the
+    # memory traffic and twice the SIMD width of float64
+    y = np.ascontiguousarray(y, dtype=np.float32)
+
+    # ---------- Shared spectrogram ----------
+    # One STFT reused by every spectral feature below (each of them would
+    # otherwise compute its own). Same n_fft/hop as librosa's defaults.
+    magnitude = np.abs(librosa.stft(y, n_fft=2048, hop_length=512, dtype=np.complex64))
+    power = magnitude ** 2
 
     # ---------- Onset detection (strumming / attacks) ----------
-    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+    # Same log-power mel input onset_strength builds from y
+    onset_env = librosa.onset.onset_strength(
+        S=librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr)),
+        sr=sr
+    )
     onset_times = librosa.onset.onset_detect(
         onset_envelope=onset_env,
         sr=sr,
         units="time"
     )
 
+    # ---------- Tempo & rhythm ----------
+    # Only the tempo is used downstream, so skip beat_track's dynamic-programming
+    # beat pass; it derives its tempo from this same estimator.
+    # beat_track reports 0 for a flat (silent) envelope, while feature.tempo
+    # falls back to its prior's peak (~117 BPM); keep the old 0.
+    if not onset_env.any():
+        tempo = 0.0
+    else:
+        tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr)[0]
+
     # ---------- Spectral features ----------
-    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
-    spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)
+    spectral_centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+    spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr)
 
     # ---------- Energy & dynamics ----------
     rms_energy = librosa.feature.rms(y=y)
     zero_crossing_rate = librosa.feature.zero_crossing_rate(y)
 
     # ---------- Pitch / harmony (for chords) ----------
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    chroma = librosa.feature.chroma_stft(S=power, sr=sr)
+
+    rms_mean, rms_std = mean_std(rms_energy.ravel())
+    zcr_mean, _ = mean_std(zero_crossing_rate.ravel())
 
     # ---------- Aggregate features ----------
     # ML models prefer summarized statistics over raw frames
     features = {
-        "duration_sec": float(librosa.get_duration(y=y, sr=sr)),
+        "duration_sec": float(y.shape[0] / sr),
         "tempo_bpm": float(tempo),
 
         "onset_count": int(len(onset_times)),
 
-        "rms_energy_mean": float(np.mean(rms_energy)),
-        "rms_energy_std": float(np.std(rms_energy)),
+        "rms_energy_mean": float(rms_mean),
+        "rms_energy_std": float(rms_std),
 
         "spectral_centroid_mean": float(np.mean(spectral_centroid)),
         "spectral_rolloff_mean": float(np.mean(spectral_rolloff)),
 
-        "zero_crossing_rate_mean": float(np.mean(zero_crossing_rate)),
+        "zero_crossing_rate_mean": float(zcr_mean),
 
         # Chroma → 12 pitch classes (C, C#, D, ...)
         "chroma_mean": np.mean(chroma, axis=1).tolist()
@@ -196,51 +365,62 @@ def analyze_audio_features(audio_path: str) -> dict:
 
 
 
-def detect_chords(features):
-    # Extract mean chroma vector (12 pitch class energies)
-    chroma = np.array(features.get("chroma_mean", []))
+# Pitch class names in chromatic order
+PITCH_CLASSES = ["C", "C#", "D", "D#", "E", "F",
+                 "F#", "G", "G#", "A", "A#", "B"]
 
-    # Ensure chroma has exactly 12 values
-    if chroma.size != 12:
-        return {"error": "Invalid chroma_mean; expected 12 pitch classes"}
+# Chord templates using pitch class activation
+CHORD_TEMPLATES = {
+    "major": np.array([1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0], dtype=np.float32),
+    "minor": np.array([1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0], dtype=np.float32),
+}
 
-    # Normalize chroma to reduce volume influence
-    chroma = chroma / (np.linalg.norm(chroma) + 1e-6)
+# Every (root, chord type) template rotated to its root, built once: (24, 12).
+# Rows are ordered root by root (C major, C minor, C# major, ...).
+CHORD_LABELS = [
+    f"{root} {chord_type}"
+    for root in PITCH_CLASSES
+    for chord_type in CHORD_TEMPLATES
+]
+CHORD_MATRIX = np.stack([
+    np.roll(template, i)
+    for i in range(len(PITCH_CLASSES))
+    for template in CHORD_TEMPLATES.values()
+])
 
-    # Define pitch class names in chromatic order
-    pitch_classes = ["C", "C#", "D", "D#", "E", "F",
-                     "F#", "G", "G#", "A", "A#", "B"]
 
-    # Define chord templates using pitch class activation
-    chord_templates = {
-        "major": np.array([1, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0]),
-        "minor": np.array([1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]),
-    }
+# Number of chord candidates returned as alternatives
+TOP_CHORDS = 5
 
-    detected_chords = []
 
-    # Iterate over all 12 possible root notes
-    for i, root in enumerate(pitch_classes):
-        for chord_type, template in chord_templates.items():
-            # Rotate chord template to match current root note
-            rotated_template = np.roll(template, i)
+def detect_chords(features):
+    # Extract mean chroma vector (12 pitch class energies)
+    chroma = np.array(features.get("chroma_mean", []), dtype=np.float32)
 
-            # Compute similarity score between chroma and chord template
-            confidence = float(np.dot(chroma, rotated_template))
+    # Ensure chroma has exactly 12 values
+    if chroma.size != 12:
+        return {"error": "Invalid chroma_mean; expected 12 pitch classes"}
+
+    # Normalize chroma (reduces volume influence) and score it against every
+    # chord template, fused into one compiled kernel
+    confidences = np.round(score_chroma(chroma, CHORD_MATRIX), 4)
 
-            # Store chord candidate with confidence score
-            detected_chords.append({
-                "chord": f"{root} {chord_type}",
-                "confidence": round(confidence, 4)
-            })
+    # Top 5 by confidence (highest first, ties keep template order) without
+    # sorting all 24: partition to find the 5th best score, then order only
+    # the candidates reaching it (ties included, so ordering stays exact)
+    kth_best = np.partition(confidences, -TOP_CHORDS)[-TOP_CHORDS]
+    candidates = np.flatnonzero(confidences >= kth_best)
+    order = candidates[np.argsort(-confidences[candidates], kind="stable")][:TOP_CHORDS]
 
-    # Sort chord candidates by confidence (highest first)
-    detected_chords.sort(key=lambda x: x["confidence"], reverse=True)
+    detected_chords = [
+        {"chord": CHORD_LABELS[i], "confidence": round(float(confidences[i]), 4)}
+        for i in order
+    ]
 
     # Return top chord and top-N alternatives
     return {
         "top_chord": detected_chords[0],
-        "alternatives": detected_chords[:5]
+        "alternatives": detected_chords
     }
 
 
@@ -256,28 +436,13 @@ def detect_rhythm(features):
     if duration <= 0:
         return {"error": "Invalid audio duration"}
 
-    # Calculate average strums per second
-    strums_per_second = onset_count / duration
-
-    # Calculate energy consistency (lower std → more consistent rhythm)
-    if rms_mean > 0:
-        energy_consistency = 1 - min(rms_std / rms_mean, 1.0)
-    else:
-        energy_consistency = 0.0
-
-    # Normalize tempo score assuming common guitar tempos (60–180 BPM)
-    if 60 <= tempo <= 180:
-        tempo_score = 1.0
-    else:
-        tempo_score = 0.5  # still acceptable but unstable
-
-    # Combine rhythm factors into a final rhythm score
-    rhythm_score = round(
-        (0.4 * energy_consistency) +
-        (0.3 * tempo_score) +
-        (0.3 * min(strums_per_second / 4, 1.0)),
-        3
+    # Strums per second, energy consistency (lower std → more consistent
+    # rhythm) and the combined score, computed in a compiled kernel
+    raw_score, strums_per_second, energy_consistency = rhythm_score_parts(
+        float(tempo), float(onset_count), float(duration),
+        float(rms_mean), float(rms_std)
     )
+    rhythm_score = round(raw_score, 3)
 
     # Classify rhythm quality based on score
     if rhythm_score >= 0.8:
@@ -339,20 +504,53 @@ def evaluate_performance(chord_result, rhythm_result):
         }
     }
 
-def save_analysis_result(s3_key, chord_result, rhythm_result, performance_score):
-    if mongodb_sync.db is None:
-        raise RuntimeError("MongoDB (sync) not initialized")
-
-    update_payload = {
+def build_analysis_update(chord_result, rhythm_result, performance_score, status="analyzed"):
+    """
+    $set document for a finished analysis, including the video's new status,
+    so results and status land in a single write.
+    """
+    now = datetime.utcnow()
+    return {
         "analysis": {
             "chords": chord_result,
             "rhythm": rhythm_result,
             "performance_score": performance_score,
         },
-        "status": "analyzed",
-        "analyzed_at": datetime.utcnow(),
+        "status": status,
+        "analyzed_at": now,
+        "updated_at": now,
     }
 
+def analyze_video(s3_key: str) -> dict:
+    """
+    Full pipeline for one video (S3 → audio → features → scores), without
+    touching the database, so results from a batch can be saved together.
+
+    Returns:
+        dict: s3_key plus chord/rhythm/performance results (JSON-serializable,
+        so it can travel through the Celery result backend)
+    """
+    samples, sr = stream_pcm_from_s3(s3_key)
+    features = analyze_audio_features(samples, sr)
+    chord_result = detect_chords(features)
+    rhythm_result = detect_rhythm(features)
+    performance_score = evaluate_performance(chord_result, rhythm_result)
+
+    return {
+        "s3_key": s3_key,
+        "chords": chord_result,
+        "rhythm": rhythm_result,
+        "performance_score": performance_score,
+    }
+
+def save_analysis_result(s3_key, chord_result, rhythm_result, performance_score, status="analyzed"):
+    if mongodb_sync.db is None:
+        raise RuntimeError("MongoDB (sync) not initialized")
+
+    update_payload = build_analysis_update(
+        chord_result, rhythm_result, performance_score, status
+    )
+
     result = mongodb_sync.db["videos"].update_one(
         {"s3_key": s3_key},
         {"$set": update_payload}
@@ -363,6 +561,34 @@ def save_analysis_result(s3_key, chord_result, rhythm_result, performance_score)
     else:
         logger.info(f"Analysis saved for s3_key={s3_key}")
 
+def save_analysis_results(items):
+    """
+    Batch version of save_analysis_result: one bulk_write round-trip for many
+    videos.
+
+    Parameters:
+    - items: iterable of (s3_key, update_payload) tuples, payloads built with
+      build_analysis_update
+    """
+    if mongodb_sync.db is None:
+        raise RuntimeError("MongoDB (sync) not initialized")
+
+    operations = [
+        UpdateOne({"s3_key": s3_key}, {"$set": payload})
+        for s3_key, payload in items
+    ]
+    if not operations:
+        return
+
+    result = mongodb_sync.db["videos"].bulk_write(operations, ordered=False)
+
+    if result.matched_count < len(operations):
+        logger.warning(
+            f"Analysis saved for {result.matched_count}/{len(operations)} videos"
+        )
+    else:
+        logger.info(f"Analysis saved for {len(operations)} videos")
+
 def update_video_status(
     s3_key: str,
     status: str